@@ -37,7 +37,7 @@ app.get('/api/health', (_req: Request, res: Response) => {
 // Analyze a URL by spawning the CLI (picture-ts)
 app.post('/api/analyze-url', async (req: Request, res: Response) => {
     try {
-        const { url, role = 'marketing', textModel, vision } = req.body || {};
+        const { url, role = 'marketing', textModel, vision, cache } = req.body || {};
         if (!url || typeof url !== 'string') {
             return res.status(400).json({ error: 'url is required' });
         }
@@ -55,6 +55,7 @@ app.post('/api/analyze-url', async (req: Request, res: Response) => {
         ];
 
         if (textModel) args.push('--text-model', String(textModel));
+        if (cache === false) args.push('--no-cache');
         if (vision?.baseUrl && vision?.model && vision?.provider) {
             args.push('--vision-base-url', String(vision.baseUrl));
             args.push('--vision-model', String(vision.model));
@@ -62,6 +63,7 @@ app.post('/api/analyze-url', async (req: Request, res: Response) => {
             if (vision.system) args.push('--vision-system', String(vision.system));
             if (vision.maxTokens) args.push('--vision-max-tokens', String(vision.maxTokens));
             if (vision.maxImages) args.push('--vision-max-images', String(vision.maxImages));
+            if (vision.concurrency) args.push('--vision-concurrency', String(vision.concurrency));
         }
 
         // Run the CLI with cwd pointing to picture-ts
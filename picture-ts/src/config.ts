@@ -3,14 +3,20 @@
  */
 import * as dotenv from 'dotenv';
 import * as path from 'path';
+import logger from './lib/logger';
 
 // Load environment variables
 dotenv.config();
 
-// Log the loaded configuration for debugging
-console.log(`[Config] Loading environment variables from .env file`);
-console.log(`[Config] API_URL: ${process.env.API_URL || 'not set, using default'}`);
-console.log(`[Config] TEXT_MODEL: ${process.env.TEXT_MODEL || 'not set, using default'}`);
+/**
+ * Log the loaded configuration for debugging (kept off stdout so CLI output stays clean).
+ * Called by the command handlers once the log level is final, so `--debug` shows it.
+ */
+export function logLoadedConfig(): void {
+    logger.debug(`[Config] Loading environment variables from .env file`);
+    logger.debug(`[Config] API_URL: ${process.env.API_URL || 'not set, using default'}`);
+    logger.debug(`[Config] TEXT_MODEL: ${process.env.TEXT_MODEL || 'not set, using default'}`);
+}
 // Vision/OpenCV removed
 
 // API configuration
@@ -18,6 +24,8 @@ export const API_URL = process.env.API_URL || 'http://localhost:11434/api/genera
 export const DEFAULT_TIMEOUT = 300; // seconds - increased from 60 to 300 to handle large text processing
 export const REQUEST_COOLDOWN = 1.0; // Seconds between API requests (rate limiting)
 export const MAX_RETRIES = 3; // Maximum number of retry attempts
+export const VISION_CONCURRENCY = Number(process.env.VISION_CONCURRENCY || 2); // Parallel vision requests (bounded by the server's parallel slots)
+export const BROWSER_IDLE_TIMEOUT = Number(process.env.BROWSER_IDLE_TIMEOUT || 5); // seconds - shared scraper browser closes after this long without a scrape
 
 // Image validation
 // Image pipeline removed
@@ -32,13 +40,13 @@ export const TEXT_MODEL = process.env.TEXT_MODEL || 'Mistral-7B-Instruct-v0.2-Q4
 export const PROGRESS_STYLES = ['simple', 'bar', 'spinner', 'none'] as const;
 export type ProgressStyle = typeof PROGRESS_STYLES[number];
 export const DEFAULT_PROGRESS_STYLE: ProgressStyle = 'spinner';
-export const SPINNER_CHARS = ['⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏'];
+export const SPINNER_CHARS: readonly string[] = Object.freeze(['⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏']);
 export const PROGRESS_BAR_LENGTH = 40;
 export const PROGRESS_REFRESH_RATE = 0.1; // seconds
 export const TOKEN_RATE_WINDOW = 5.0; // Calculate token rate over this many seconds
 
 // Estimated tokens for different models
-export const ESTIMATED_TOKENS: Record<string, number> = {
+export const ESTIMATED_TOKENS: Readonly<Record<string, number>> = Object.freeze({
     'yasserrmd/Nanonets-OCR-s:latest': 800, // Higher estimate for detailed OCR output
     'llava:13b': 300,
     'llava:34b': 500,
@@ -50,7 +58,7 @@ export const ESTIMATED_TOKENS: Record<string, number> = {
     'command-r': 300,
     'qwen:32b': 800, // Higher estimate for detailed qwen summarization output
     'my-mistral-instruct:latest': 800, // Higher estimate for detailed mistral summarization output
-};
+});
 
 // Default prompts
 export const DEFAULT_ANALYSIS_PROMPT = 'Extract all text content from the provided image. Preserve the original structure and formatting in markdown.';
@@ -150,14 +158,16 @@ export const DEFAULT_CHUNK_OVERLAP = Number(process.env.CHUNK_OVERLAP || 0.3);
 
 // File paths
 export const DEFAULT_OUTPUT_DIR = 'results';
+export const RESPONSE_CACHE_DIR = process.env.RESPONSE_CACHE_DIR || path.join(DEFAULT_OUTPUT_DIR, '.cache'); // Vision caption cache (see lib/cache.ts)
+export const RESPONSE_CACHE_MAX_ENTRIES = Number(process.env.RESPONSE_CACHE_MAX_ENTRIES || 500); // Least recently used entries beyond this are evicted
 export const LOG_DIR = 'logs';
 export const LOG_FILE = path.join(LOG_DIR, 'image_analyzer.log');
 
 // Create a mapping from role to prompt
-export const ROLE_PROMPTS: Record<Role, string> = {
+export const ROLE_PROMPTS: Readonly<Record<Role, string>> = Object.freeze({
     marketing: MARKETING_MANAGER_PROMPT,
     po: PO_PROMPT,
-};
+});
 
 // Helper function to get prompt by role
 export function getPromptByRole(role: Role): string {
@@ -1,5 +1,6 @@
 export { default as pipelineService } from './services/pipeline.service';
-export { scrapeContent } from './services/scraper.service';
+export { scrapeContent, closeBrowser } from './services/scraper.service';
+export { setCacheEnabled } from './lib/cache';
 export type { ImageInfo, ScrapeResult } from './services/scraper.service';
 export { default as ollamaService } from './services/ollama.service';
 // Re-export common types for consumers (e.g., api package)
@@ -0,0 +1,105 @@
+/**
+ * On-disk cache for vision captions.
+ * Entries are plain text files named by a sha256 of everything that shapes the
+ * response (endpoint, model, prompt, options, image data). The directory holds at most
+ * RESPONSE_CACHE_MAX_ENTRIES files; the least recently used are evicted. Delete it to reset.
+ */
+import { createHash } from 'crypto';
+import { promises as fs } from 'fs';
+import * as path from 'path';
+import logger from './logger';
+import { RESPONSE_CACHE_DIR, RESPONSE_CACHE_MAX_ENTRIES } from '../config';
+
+let enabled = true;
+const inFlight = new Map<string, Promise<string>>(); // requests currently running, by cache key
+
+/**
+ * Turn the cache on or off for this process (e.g. from `--no-cache`).
+ */
+export function setCacheEnabled(on: boolean): void {
+    enabled = on;
+}
+
+/**
+ * Build a cache key from the parts that determine a response.
+ */
+export function cacheKey(...parts: string[]): string {
+    const hash = createHash('sha256');
+    for (const part of parts) {
+        hash.update(part);
+        hash.update('\0');
+    }
+    return hash.digest('hex');
+}
+
+function entryPath(key: string): string {
+    return path.join(path.resolve(process.cwd(), RESPONSE_CACHE_DIR), `${key}.txt`);
+}
+
+/**
+ * Look up a cached response. Returns null on a miss or when caching is disabled.
+ */
+export async function getCached(key: string): Promise<string | null> {
+    if (!enabled) return null;
+    try {
+        const file = entryPath(key);
+        const value = await fs.readFile(file, 'utf-8');
+        // Bump the mtime so eviction drops the least recently used entries first
+        const now = new Date();
+        await fs.utimes(file, now, now).catch(() => { /* ignore */ });
+        return value;
+    } catch {
+        return null;
+    }
+}
+
+/**
+ * Delete the oldest entries (by mtime) once `dir` holds more than RESPONSE_CACHE_MAX_ENTRIES.
+ */
+async function evictOldest(dir: string): Promise<void> {
+    const names = (await fs.readdir(dir)).filter(name => name.endsWith('.txt'));
+    if (names.length <= RESPONSE_CACHE_MAX_ENTRIES) return;
+    const entries = await Promise.all(names.map(async (name) => {
+        const file = path.join(dir, name);
+        try {
+            return { file, mtime: (await fs.stat(file)).mtimeMs };
+        } catch {
+            return null; // removed concurrently
+        }
+    }));
+    const live = entries
+        .filter((e): e is { file: string; mtime: number; } => e !== null)
+        .sort((a, b) => a.mtime - b.mtime);
+    await Promise.all(live
+        .slice(0, live.length - RESPONSE_CACHE_MAX_ENTRIES)
+        .map(e => fs.unlink(e.file).catch(() => { /* ignore */ })));
+}
+
+/**
+ * Store a response. Failures are logged and otherwise ignored.
+ */
+export async function setCached(key: string, value: string): Promise<void> {
+    if (!enabled || !value) return;
+    try {
+        const file = entryPath(key);
+        const dir = path.dirname(file);
+        await fs.mkdir(dir, { recursive: true });
+        await fs.writeFile(file, value, 'utf-8');
+        await evictOldest(dir);
+    } catch (error) {
+        logger.warn(`Failed to write response cache entry: ${error}`);
+    }
+}
+
+/**
+ * Run `produce` for `key`, or join the call already running for the same key.
+ * Identical requests issued concurrently (before either can populate the cache) then cost one
+ * model call. Applies even with the disk cache disabled, since it never outlives the request.
+ */
+export function shareInFlight(key: string, produce: () => Promise<string>): Promise<string> {
+    const running = inFlight.get(key);
+    if (running) return running;
+    const request = produce().finally(() => inFlight.delete(key));
+    inFlight.set(key, request);
+    return request;
+}
@@ -0,0 +1,23 @@
+/**
+ * Run `fn` over `items` with at most `limit` calls in flight at once.
+ * Results are returned in input order, regardless of completion order.
+ */
+export async function mapWithConcurrency<T, R>(
+    items: readonly T[],
+    limit: number,
+    fn: (item: T, index: number) => Promise<R>
+): Promise<R[]> {
+    const results = new Array<R>(items.length);
+    const workers = Math.max(1, Math.min(Math.floor(limit) || 1, items.length));
+    let next = 0;
+
+    async function worker(): Promise<void> {
+        while (next < items.length) {
+            const i = next++;
+            results[i] = await fn(items[i], i);
+        }
+    }
+
+    await Promise.all(Array.from({ length: workers }, () => worker()));
+    return results;
+}
@@ -1,7 +1,7 @@
 import { promises as fs } from 'fs';
 import { extname } from 'path';
 
-const mimeByExt: Record<string, string> = {
+const mimeByExt: Readonly<Record<string, string>> = Object.freeze({
     '.jpg': 'image/jpeg',
     '.jpeg': 'image/jpeg',
     '.png': 'image/png',
@@ -10,13 +10,16 @@ const mimeByExt: Record<string, string> = {
     '.gif': 'image/gif',
     '.tif': 'image/tiff',
     '.tiff': 'image/tiff',
-};
+});
+
+export function bufferToDataUri(buf: Buffer, mime: string): string {
+    return `data:${mime};base64,${buf.toString('base64')}`;
+}
 
 export async function fileToDataUri(path: string, explicitMime?: string): Promise<string> {
     const buf = await fs.readFile(path);
-    const b64 = buf.toString('base64');
     const mime = explicitMime ?? mimeByExt[extname(path).toLowerCase()] ?? 'application/octet-stream';
-    return `data:${mime};base64,${b64}`;
+    return bufferToDataUri(buf, mime);
 }
 
 
@@ -16,12 +16,18 @@ import {
     ESTIMATED_TOKENS
 } from '../config';
 
+let interactiveTerminal: boolean | null = null; // stdout cannot change TTY-ness mid-run
+
 /**
  * Check if the terminal is interactive
+ * The answer is computed once and reused by every tracker.
  * @returns True if the terminal is interactive
  */
 function isInteractiveTerminal(): boolean {
-    return process.stdout.isTTY;
+    if (interactiveTerminal === null) {
+        interactiveTerminal = Boolean(process.stdout.isTTY);
+    }
+    return interactiveTerminal;
 }
 
 /**
@@ -53,9 +59,12 @@ class ProgressTrackerImpl implements ProgressTracker {
     private spinner: any | null; // ora spinner instance
     private progressBar: cliProgress.SingleBar | null;
     private tokenHistory: Array<[number, number]>; // [timestamp, tokens]
+    private historyStart: number; // index of the oldest entry still inside the rate window
+    private windowTokens: number; // sum of tokens from historyStart to the end of tokenHistory
+    private recordedTokens: number; // tokens already added to tokenHistory
     private showTokensPerSecond: boolean;
     private showTimeElapsed: boolean;
-
+    private lastStatus: string; // last line written by the 'simple' style
     /**
      * Create a new ProgressTrackerImpl
      */
@@ -71,8 +80,12 @@ class ProgressTrackerImpl implements ProgressTracker {
         this.spinner = null;
         this.progressBar = null;
         this.tokenHistory = [];
+        this.historyStart = 0;
+        this.windowTokens = 0;
+        this.recordedTokens = 0;
         this.showTokensPerSecond = false;
         this.showTimeElapsed = false;
+        this.lastStatus = '';
     }
 
     /**
@@ -88,8 +101,12 @@ class ProgressTrackerImpl implements ProgressTracker {
         this.lastUpdateTime = this.startTime;
         this.isComplete = false;
         this.tokenHistory = [];
+        this.historyStart = 0;
+        this.windowTokens = 0;
+        this.recordedTokens = 0;
         this.showTokensPerSecond = options.showTokensPerSecond || false;
         this.showTimeElapsed = options.showTimeElapsed || false;
+        this.lastStatus = '';
 
         // Don't show progress if not interactive or style is none
         if (!this.interactive || this.style === 'none') {
@@ -105,7 +122,7 @@ class ProgressTrackerImpl implements ProgressTracker {
                 this.spinner = ora({
                     text: `${this.title}...`,
                     spinner: {
-                        frames: SPINNER_CHARS
+                        frames: [...SPINNER_CHARS]
                     }
                 }).start();
                 break;
@@ -158,18 +175,14 @@ class ProgressTrackerImpl implements ProgressTracker {
         }
 
         // Update token history for rate calculation
-        const tokenDiff = current - this.tokenHistory.reduce((sum, [_, tokens]) => sum + tokens, 0);
+        const tokenDiff = current - this.recordedTokens;
         if (tokenDiff > 0) {
-            this.tokenHistory.push([now, tokenDiff]);
+            this.recordTokens(now, tokenDiff);
+            this.recordedTokens = current;
         }
 
         // Clean up history older than the window
-        while (
-            this.tokenHistory.length > 0 &&
-            this.tokenHistory[0][0] < now - TOKEN_RATE_WINDOW * 1000
-        ) {
-            this.tokenHistory.shift();
-        }
+        this.evictOldTokens(now);
 
         this.lastUpdateTime = now;
 
@@ -236,7 +249,7 @@ class ProgressTrackerImpl implements ProgressTracker {
 
                 status += ` | ETA: ${etaFormatted}`;
 
-                process.stdout.write(status);
+                this.writeStatus(status);
                 break;
         }
     }
@@ -247,20 +260,21 @@ class ProgressTrackerImpl implements ProgressTracker {
      * @param tokens Number of new tokens generated
      */
     updateTokens(tokens: number): void {
-        const now = Date.now();
-
-        // Update token history for rate calculation
         if (tokens > 0) {
-            this.tokenHistory.push([now, tokens]);
             this.current += tokens;
+            this.recordedTokens = this.current;
         }
 
-        // Clean up history older than the window
-        while (
-            this.tokenHistory.length > 0 &&
-            this.tokenHistory[0][0] < now - TOKEN_RATE_WINDOW * 1000
-        ) {
-            this.tokenHistory.shift();
+        // Nothing is displayed if not interactive or style is none, so the rate is never needed
+        if (!this.interactive || this.style === 'none') {
+            return;
+        }
+
+        const now = Date.now();
+
+        // Update token history for rate calculation
+        if (tokens > 0) {
+            this.recordTokens(now, tokens);
         }
 
         const timeDiff = (now - this.lastUpdateTime) / 1000;
@@ -272,10 +286,8 @@ class ProgressTrackerImpl implements ProgressTracker {
 
         this.lastUpdateTime = now;
 
-        // Don't update display if not interactive or style is none
-        if (!this.interactive || this.style === 'none') {
-            return;
-        }
+        // Clean up history older than the window (only needed when the rate is about to be shown)
+        this.evictOldTokens(now);
 
         const elapsed = (now - this.startTime) / 1000;
         const rate = this.getTokenRate();
@@ -327,7 +339,7 @@ class ProgressTrackerImpl implements ProgressTracker {
                     status += ` | Time: ${formatTime(elapsed)}`;
                 }
 
-                process.stdout.write(status);
+                this.writeStatus(status);
                 break;
         }
     }
@@ -373,6 +385,18 @@ class ProgressTrackerImpl implements ProgressTracker {
         }
     }
 
+    /**
+     * Write a 'simple' status line, skipping the write when nothing visible changed
+     * @param status Status line, including the leading carriage return
+     */
+    private writeStatus(status: string): void {
+        if (status === this.lastStatus) {
+            return;
+        }
+        this.lastStatus = status;
+        process.stdout.write(status);
+    }
+
     /**
      * Clean up any existing progress displays
      */
@@ -388,16 +412,48 @@ class ProgressTrackerImpl implements ProgressTracker {
         }
     }
 
+    /**
+     * Append an entry to the token history and the running window sum
+     * @param now Timestamp of the tokens in milliseconds
+     * @param tokens Number of tokens
+     */
+    private recordTokens(now: number, tokens: number): void {
+        this.tokenHistory.push([now, tokens]);
+        this.windowTokens += tokens;
+    }
+
+    /**
+     * Drop history entries older than the rate window.
+     * Entries are skipped by advancing historyStart rather than shifted out, so eviction is O(1)
+     * per entry; the array is compacted once the dead prefix outweighs the live part.
+     * @param now Current timestamp in milliseconds
+     */
+    private evictOldTokens(now: number): void {
+        const cutoff = now - TOKEN_RATE_WINDOW * 1000;
+        while (
+            this.historyStart < this.tokenHistory.length &&
+            this.tokenHistory[this.historyStart][0] < cutoff
+        ) {
+            this.windowTokens -= this.tokenHistory[this.historyStart][1];
+            this.historyStart++;
+        }
+
+        if (this.historyStart > 64 && this.historyStart * 2 > this.tokenHistory.length) {
+            this.tokenHistory = this.tokenHistory.slice(this.historyStart);
+            this.historyStart = 0;
+        }
+    }
+
     /**
      * Calculate tokens per second over the recent window
      * @returns Token generation rate in tokens per second
      */
     private getTokenRate(): number {
-        if (this.tokenHistory.length < 2) {
+        if (this.tokenHistory.length - this.historyStart < 2) {
             return 0;
         }
 
-        const oldestTime = this.tokenHistory[0][0];
+        const oldestTime = this.tokenHistory[this.historyStart][0];
         const newestTime = this.tokenHistory[this.tokenHistory.length - 1][0];
         const timeDiff = (newestTime - oldestTime) / 1000;
 
@@ -405,8 +461,7 @@ class ProgressTrackerImpl implements ProgressTracker {
             return 0;
         }
 
-        const totalTokens = this.tokenHistory.reduce((sum, [_, tokens]) => sum + tokens, 0);
-        return totalTokens / timeDiff;
+        return this.windowTokens / timeDiff;
     }
 }
 
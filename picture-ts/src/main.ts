@@ -7,12 +7,17 @@ import yargs from 'yargs';
 import { hideBin } from 'yargs/helpers';
 import * as path from 'path';
 import logger from './lib/logger';
-import pipelineService from './services/pipeline.service';
+import { setCacheEnabled } from './lib/cache';
 import { Role } from './types';
-import { DEFAULT_OUTPUT_DIR, DEFAULT_ROLE, TEXT_MODEL, ROLES } from './config';
+import { DEFAULT_OUTPUT_DIR, DEFAULT_ROLE, TEXT_MODEL, ROLES, VISION_CONCURRENCY, logLoadedConfig } from './config';
 
 // No file validation needed (no image inputs)
 
+// The pipeline pulls in axios and Playwright; load it only when a command actually runs
+async function loadPipeline() {
+    return (await import('./services/pipeline.service')).default;
+}
+
 // Simple common options for URL commands
 const urlCommonOptions = {
     'debug': {
@@ -74,8 +79,10 @@ yargs(hideBin(process.argv))
                 if (argv.debug) {
                     logger.level = 'debug';
                 }
+                logLoadedConfig();
                 const url = argv.url as string;
                 logger.info(`Scraping URL: ${url}`);
+                const pipelineService = await loadPipeline();
                 const { text, images, textPath, imagesPath } = await pipelineService.runScrapePipeline({ url, save: argv.save as boolean, output: argv.output as string });
                 console.log('\n--- Scrape Result (first 500 chars) ---\n');
                 console.log(text.slice(0, 500));
@@ -123,6 +130,11 @@ yargs(hideBin(process.argv))
                     type: 'boolean',
                     default: false
                 })
+                .option('cache', {
+                    describe: 'Reuse cached vision captions (disable with --no-cache)',
+                    type: 'boolean',
+                    default: true
+                })
                 .option('output', {
                     describe: 'Output directory for saved results',
                     type: 'string',
@@ -154,6 +166,10 @@ yargs(hideBin(process.argv))
                     type: 'number',
                     describe: 'Max images to caption (default 1)'
                 })
+                .option('vision-concurrency', {
+                    type: 'number',
+                    describe: `Max vision requests in flight at once (default ${VISION_CONCURRENCY})`
+                })
                 .example('$0 analyze-url https://example.com', 'Scrape and analyze the URL with default role')
                 .example('$0 analyze-url https://example.com --role marketing', 'Scrape and analyze using marketing role');
         },
@@ -162,6 +178,10 @@ yargs(hideBin(process.argv))
                 if (argv.debug) {
                     logger.level = 'debug';
                 }
+                logLoadedConfig();
+                if (argv.cache === false) {
+                    setCacheEnabled(false);
+                }
                 const url = argv.url as string;
                 const role = argv.role as Role;
                 logger.info(`Analyzing URL: ${url} with role: ${role}`);
@@ -174,13 +194,20 @@ yargs(hideBin(process.argv))
                         maxTokens: argv['vision-max-tokens'] as number | undefined,
                     }
                     : undefined;
+                const pipelineService = await loadPipeline();
                 const { analysis, textPath, imagesPath, analysisPath } = await pipelineService.runAnalysisFromUrl({
                     url,
                     role,
                     textModel: argv['text-model'] as string,
                     save: argv.save as boolean,
                     output: argv.output as string,
-                    vision: vision ? { ...vision, maxImages: (argv['vision-max-images'] as number | undefined) } : undefined,
+                    vision: vision
+                        ? {
+                            ...vision,
+                            maxImages: (argv['vision-max-images'] as number | undefined),
+                            concurrency: (argv['vision-concurrency'] as number | undefined),
+                        }
+                        : undefined,
                 });
                 console.log(`\n--- Analysis Result (${role}) ---\n`);
                 console.log(analysis);
@@ -1,19 +1,20 @@
-import { promises as fs } from 'fs';
-import { tmpdir } from 'os';
-import { join } from 'path';
+import { bufferToDataUri } from '../lib/datauri';
 
-export async function downloadImage(url: string): Promise<string> {
+async function fetchImage(url: string): Promise<{ buf: Buffer; contentType: string }> {
     const r = await fetch(url);
     if (!r.ok) throw new Error(`HTTP ${r.status} for ${url}`);
-    const ct = r.headers.get('content-type') || '';
-    const ext = ct.includes('png') ? '.png' : ct.includes('webp') ? '.webp' : ct.includes('gif') ? '.gif' : '.jpg';
-    const p = join(
-        tmpdir(),
-        `pic_${Date.now()}_${Math.random().toString(36).slice(2)}${ext}`
-    );
+    const contentType = r.headers.get('content-type') || '';
     const buf = Buffer.from(await r.arrayBuffer());
-    await fs.writeFile(p, buf);
-    return p;
+    return { buf, contentType };
+}
+
+/**
+ * Download an image straight into a base64 data URI, without a temp file round-trip.
+ */
+export async function downloadImageDataUri(url: string): Promise<string> {
+    const { buf, contentType } = await fetchImage(url);
+    const mime = contentType.startsWith('image/') ? contentType.split(';', 1)[0].trim() : 'image/jpeg';
+    return bufferToDataUri(buf, mime);
 }
 
 
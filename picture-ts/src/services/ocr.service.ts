@@ -1,34 +1,51 @@
 import logger from '../lib/logger';
 import { fileToDataUri } from '../lib/datauri';
+import { mapWithConcurrency } from '../lib/concurrency';
+import { cacheKey, getCached, setCached, shareInFlight } from '../lib/cache';
 import { visionChat, VisionClientOptions } from './vision.client';
+import { VISION_CONCURRENCY } from '../config';
 
 /**
- * For a list of image file paths, ask the configured vision model to caption/transcribe.
- * Returns a list of markdown strings (one per image) filtered of empties.
+ * For a list of images (file paths or base64 data URIs), ask the configured vision model to caption/transcribe.
+ * Requests run concurrently (up to `concurrency`, default VISION_CONCURRENCY) so the
+ * vision server can overlap work.
+ * Returns one markdown string per input image, in input order; an empty string marks
+ * an image whose request failed or came back blank.
  */
 export async function runVisionCaption(
-    imagePaths: string[],
+    images: string[],
     prompt: string,
-    client: VisionClientOptions
+    client: VisionClientOptions,
+    concurrency: number = VISION_CONCURRENCY
 ): Promise<string[]> {
-    const outputs: string[] = [];
-    for (const p of imagePaths) {
+    return mapWithConcurrency(images, concurrency, async (src, i) => {
+        const isDataUri = src.startsWith('data:');
+        const p = isDataUri ? `image ${i + 1}` : src; // label for logs
         try {
-            const dataUri = await fileToDataUri(p);
-            logger.debug(`Calling vision model for image: ${p}`);
-            const md = await visionChat(dataUri, prompt, client);
-            logger.debug(`Vision response for ${p}: "${md}" (length: ${md?.length || 0})`);
-            if (md && md.trim()) {
-                outputs.push(md.trim());
-                logger.debug(`Added vision caption (trimmed length: ${md.trim().length})`);
-            } else {
+            const dataUri = isDataUri ? src : await fileToDataUri(src);
+            const key = cacheKey(client.provider, client.baseUrl, client.model, client.system ?? '', String(client.maxTokens ?? ''), prompt, dataUri);
+            return await shareInFlight(key, async () => {
+                const cached = await getCached(key);
+                if (cached !== null) {
+                    logger.debug(`Using cached vision caption for ${p}`);
+                    return cached;
+                }
+                logger.debug(`Calling vision model for image: ${p}`);
+                const md = await visionChat(dataUri, prompt, client);
+                if (logger.isDebugEnabled()) {
+                    logger.debug(`Vision response for ${p}: "${md}" (length: ${md?.length || 0})`);
+                }
+                if (md && md.trim()) {
+                    logger.debug(`Added vision caption (trimmed length: ${md.trim().length})`);
+                    await setCached(key, md.trim());
+                    return md.trim();
+                }
                 logger.warn(`Empty or whitespace-only vision response for ${p}`);
-            }
+                return '';
+            });
         } catch (e) {
             logger.error(`[runVisionCaption] failed for ${p}: ${String(e)}`);
         }
-    }
-    return outputs;
+        return '';
+    });
 }
-
-
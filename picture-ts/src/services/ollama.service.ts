@@ -4,7 +4,11 @@
  */
 
 import axios from 'axios';
+import * as http from 'http';
+import * as https from 'https';
+import { StringDecoder } from 'string_decoder';
 import logger from '../lib/logger';
+import { cacheKey, shareInFlight } from '../lib/cache';
 import { OllamaRequest, OllamaResponse, Role } from '../types';
 import {
     API_URL,
@@ -18,6 +22,51 @@ import {
 
 const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
 
+const RETRY_BASE_MS = 1000;
+const RETRY_CAP_MS = 10000;
+
+/**
+ * Decorrelated-jitter backoff: a random delay between the base and three times the previous
+ * delay, capped. Concurrent requests that fail together then retry at different times instead
+ * of hitting the server again in lockstep.
+ */
+function nextBackoff(prevMs: number): number {
+    return Math.min(RETRY_CAP_MS, RETRY_BASE_MS + Math.random() * (prevMs * 3 - RETRY_BASE_MS));
+}
+
+// One pooled, keep-alive client shared by every request so retries and
+// back-to-back generations reuse the same sockets to the Ollama server
+const agentOptions = { keepAlive: true, maxSockets: 16 };
+const client = axios.create({
+    httpAgent: new http.Agent(agentOptions),
+    httpsAgent: new https.Agent(agentOptions),
+});
+
+// Prompt templates split once around their placeholder, keyed by template then placeholder
+const templateParts = new Map<string, Map<string, [string, string]>>();
+
+/**
+ * Substitute `value` for the first `placeholder` in `template`.
+ * The split is computed once per template; plain concatenation also avoids
+ * String.replace treating `$&`/`$'` sequences in scraped text as patterns.
+ */
+function fillTemplate(template: string, placeholder: string, value: string): string {
+    let byPlaceholder = templateParts.get(template);
+    if (!byPlaceholder) {
+        byPlaceholder = new Map();
+        templateParts.set(template, byPlaceholder);
+    }
+    let parts = byPlaceholder.get(placeholder);
+    if (!parts) {
+        const at = template.indexOf(placeholder);
+        parts = at === -1
+            ? [template, '']
+            : [template.slice(0, at), template.slice(at + placeholder.length)];
+        byPlaceholder.set(placeholder, parts);
+    }
+    return parts[0] + value + parts[1];
+}
+
 export class OllamaService {
     private progressTracker: { updateTokens(tokens: number): void } | null = null;
 
@@ -34,40 +83,86 @@ export class OllamaService {
      * It handles streaming, retries, and progress tracking.
      */
     private async makeRequest(payload: OllamaRequest, timeoutSeconds: number): Promise<string> {
-        let attempts = 0;
         payload.stream = true; // Always stream for progress tracking
 
+        const key = cacheKey(
+            API_URL,
+            payload.model,
+            payload.prompt,
+            JSON.stringify(payload.options ?? {}),
+            ...(payload.images ?? [])
+        );
+        // Text generations are sampled (temperature 0.1), so a stored answer would replay one draw
+        // forever; they are never persisted. Only identical requests running at the same time share a call.
+        return shareInFlight(key, () => this.requestWithRetries(payload, timeoutSeconds));
+    }
+
+    /**
+     * Send the request, retrying with backoff, and return the streamed response.
+     */
+    private async requestWithRetries(payload: OllamaRequest, timeoutSeconds: number): Promise<string> {
+        let attempts = 0;
+        let backoffMs = RETRY_BASE_MS;
+
         while (attempts < MAX_RETRIES) {
             try {
                 if (attempts > 0) {
-                    const backoffMs = Math.min(1000 * Math.pow(2, attempts), 10000);
-                    logger.info(`Retry attempt ${attempts + 1}/${MAX_RETRIES}, waiting ${backoffMs}ms...`);
+                    backoffMs = nextBackoff(backoffMs);
+                    logger.info(`Retry attempt ${attempts + 1}/${MAX_RETRIES}, waiting ${Math.round(backoffMs)}ms...`);
                     await sleep(backoffMs);
                 }
 
                 logger.debug(`Making request to ${API_URL} with model ${payload.model}`);
 
-                const response = await axios.post(API_URL, payload, {
+                const response = await client.post(API_URL, payload, {
                     headers: { 'Content-Type': 'application/json' },
                     timeout: timeoutSeconds * 1000,
                     responseType: 'stream'
                 });
 
-                let fullResponse = '';
-                return new Promise<string>((resolve, reject) => {
+                const parts: string[] = [];
+                // Network chunks don't align with NDJSON lines (or UTF-8 sequences): decode
+                // incrementally and hold back the trailing partial line until the next chunk
+                const decoder = new StringDecoder('utf8');
+                let pending = '';
+                // A generation is complete only if it ended with a `done` frame and no error frame
+                let sawDone = false;
+                let streamError: string | null = null;
+                const handleLine = (line: string) => {
+                    if (!line.trim()) return;
+                    try {
+                        const data: OllamaResponse = JSON.parse(line);
+                        if (data.error) {
+                            streamError = data.error;
+                            logger.error(`Ollama stream error for model ${payload.model}: ${data.error}`);
+                        }
+                        if (data.done) {
+                            sawDone = true;
+                        }
+                        if (data.response) {
+                            parts.push(data.response);
+                            this.progressTracker?.updateTokens(data.response.length);
+                        }
+                    } catch {
+                        logger.debug(`Skipping unparseable stream line: ${line.slice(0, 200)}`);
+                    }
+                };
+                // Awaited here so a stream that fails midway lands in the catch below and is retried
+                return await new Promise<string>((resolve, reject) => {
                     response.data.on('data', (chunk: Buffer) => {
-                        try {
-                            const lines = chunk.toString().split('\n').filter(line => line.trim());
-                            for (const line of lines) {
-                                const data: OllamaResponse = JSON.parse(line);
-                                if (data.response) {
-                                    fullResponse += data.response;
-                                    this.progressTracker?.updateTokens(data.response.length);
-                                }
-                            }
-                        } catch (e) { /* Ignore parsing errors for incomplete stream chunks */ }
+                        const lines = (pending + decoder.write(chunk)).split('\n');
+                        pending = lines.pop() ?? '';
+                        for (const line of lines) {
+                            handleLine(line);
+                        }
                     });
                     response.data.on('end', () => {
+                        handleLine(pending + decoder.end());
+                        pending = '';
+                        const fullResponse = parts.join('');
+                        if (!sawDone || streamError !== null) {
+                            logger.warn(`Ollama stream for model ${payload.model} ended without completing`);
+                        }
                         sleep(REQUEST_COOLDOWN * 1000).then(() => resolve(fullResponse));
                     });
                     response.data.on('error', reject);
@@ -92,7 +187,7 @@ export class OllamaService {
         if (texts.length === 1) return texts[0];
 
         const combinedTexts = texts.map((text, i) => `--- CHUNK ${i + 1} ---\n${text}`).join('\n\n');
-        const prompt = CHUNK_COMBINE_PROMPT.replace('{chunks_text}', combinedTexts);
+        const prompt = fillTemplate(CHUNK_COMBINE_PROMPT, '{chunks_text}', combinedTexts);
 
         const payload: OllamaRequest = {
             model: TEXT_MODEL,
@@ -107,7 +202,7 @@ export class OllamaService {
      */
     public async analyzeDocument(document: string, role: Role, modelOverride?: string): Promise<string> {
         const rolePrompt = getPromptByRole(role);
-        const prompt = rolePrompt.replace('{document_text}', document);
+        const prompt = fillTemplate(rolePrompt, '{document_text}', document);
 
         const payload: OllamaRequest = {
             model: modelOverride || TEXT_MODEL,
@@ -130,11 +225,12 @@ export class OllamaService {
 
             const fullPrompt = `${prompt}\n\nDocument to analyze:\n\n${document}`;
 
-            const result = await this.makeTextRequest(
-                TEXT_MODEL,
-                fullPrompt,
-                true // This is a long operation
-            );
+            const payload: OllamaRequest = {
+                model: TEXT_MODEL,
+                prompt: fullPrompt,
+                options: { temperature: 0.1 }
+            };
+            const result = await this.makeRequest(payload, TEXT_OPERATION_TIMEOUT);
 
             logger.debug('Successfully analyzed document with custom prompt');
             return result;
@@ -5,9 +5,17 @@ import ollamaService from './ollama.service';
 import { scrapeContent, ScrapeResult, ImageInfo } from './scraper.service';
 import { writeImagesMarkdown } from './save-markdown.service';
 import { Role } from '../types';
-import { DEFAULT_OUTPUT_DIR } from '../config';
-import { downloadImage } from './image-download.service';
+import { DEFAULT_OUTPUT_DIR, VISION_CONCURRENCY } from '../config';
+import { downloadImageDataUri } from './image-download.service';
 import { runVisionCaption } from './ocr.service';
+import { mapWithConcurrency } from '../lib/concurrency';
+
+const BULLET_PREFIX_RE = /^[-*•]\s*/;
+const KEYWORD_RE = /[a-z0-9]{6,}/gi; // fallback theme candidates
+const SCORE_RE = /score:\s*(\d+)\s*-?\s*/i; // "Score: X - Reason"
+// "Image N: Score: X - Reason", optionally behind a list marker ("1.", "2)", "-", "*", "•").
+// Only [^\S\n] (whitespace other than newline) is allowed between parts, so a match never spills into the next line.
+const BATCH_SCORE_RE = /^[^\S\n]*(?:\d+[.)]|[-*•])?[^\w\n]*image[^\S\n]+(\d+)[^\w\n]+score:[^\S\n]*(\d+)[^\S\n]*-?[^\S\n]*(.*)$/gim;
 
 export class PipelineService {
     constructor() { }
@@ -22,8 +30,11 @@ export class PipelineService {
         let textPath: string | null = null;
         let imagesPath: string | null = null;
         if (save && output) {
-            textPath = await this.saveMarkdown(`% Scrape Result\n\n**Source:** <${url}>\n\n\n${text}\n`, output, 'scrape_result.md');
-            imagesPath = await writeImagesMarkdown(url, images, this.getOutputDir(output));
+            // The two files are independent; write them concurrently
+            [textPath, imagesPath] = await Promise.all([
+                this.saveMarkdown(`% Scrape Result\n\n**Source:** <${url}>\n\n\n${text}\n`, output, 'scrape_result.md'),
+                writeImagesMarkdown(url, images, this.getOutputDir(output)),
+            ]);
         }
         return { text, images, textPath, imagesPath };
     }
@@ -41,7 +52,7 @@ ${pageText.substring(0, 2000)}${pageText.length > 2000 ? '...' : ''}`;
             const response = await ollamaService.analyzeWithPrompt('', prompt);
             const themes = response
                 .split('\n')
-                .map(line => line.replace(/^[-*•]\s*/, '').trim())
+                .map(line => line.replace(BULLET_PREFIX_RE, '').trim())
                 .filter(line => line.length > 0 && line.length < 100)
                 .slice(0, 5);
 
@@ -49,58 +60,67 @@ ${pageText.substring(0, 2000)}${pageText.length > 2000 ? '...' : ''}`;
             return themes;
         } catch (error) {
             logger.warn(`Failed to extract themes: ${error}`);
-            // Fallback to basic keyword extraction
-            return pageText.toLowerCase()
-                .split(/[^a-z0-9]+/)
-                .filter(w => w.length >= 6)
-                .slice(0, 5);
+            // Fallback to basic keyword extraction; scan lazily and stop at the fifth keyword
+            // instead of lowercasing and splitting the whole page
+            const keywords: string[] = [];
+            for (const m of pageText.matchAll(KEYWORD_RE)) {
+                keywords.push(m[0].toLowerCase());
+                if (keywords.length === 5) break;
+            }
+            return keywords;
         }
     }
 
     /**
      * Get quick descriptions of images using vision model for semantic understanding.
+     * Downloads and vision requests run concurrently (bounded by `visionConfig.concurrency`).
+     * Downloaded images are stored in `dataUris` (keyed by src) so later passes can reuse them.
      */
-    private async getQuickImageDescriptions(images: ImageInfo[], visionConfig: any): Promise<Array<{ img: ImageInfo; description: string; }>> {
-        const results: Array<{ img: ImageInfo; description: string; }> = [];
-
+    private async getQuickImageDescriptions(images: ImageInfo[], visionConfig: any, dataUris: Map<string, string>): Promise<Array<{ img: ImageInfo; description: string; }>> {
         // Limit to first 10 images for quick pass to avoid overwhelming the system
         const imagesToProcess = images.slice(0, 10);
+        const concurrency = visionConfig.concurrency ?? VISION_CONCURRENCY;
 
-        for (const img of imagesToProcess) {
+        const downloaded = await mapWithConcurrency(imagesToProcess, concurrency, async (img) => {
             try {
                 logger.debug(`Getting quick description for: ${img.src}`);
-                const p = await downloadImage(img.src);
-                const description = await runVisionCaption(
-                    [p],
-                    'Describe this image in 1-2 sentences. Focus on the main subject and any text visible.',
-                    {
-                        baseUrl: visionConfig.baseUrl,
-                        model: visionConfig.model,
-                        provider: visionConfig.provider,
-                        maxTokens: 100, // Short descriptions only
-                    }
-                );
-
-                results.push({
-                    img,
-                    description: description[0] || ''
-                });
-
-                logger.debug(`Quick description: "${description[0]?.substring(0, 100)}..."`);
+                const dataUri = await downloadImageDataUri(img.src);
+                dataUris.set(img.src, dataUri);
+                return dataUri;
             } catch (error) {
                 logger.warn(`Failed to get quick description for ${img.src}: ${error}`);
-                results.push({
-                    img,
-                    description: img.alt || img.caption || ''
-                });
+                return null;
             }
-        }
-
-        return results;
+        });
+
+        const toCaption = downloaded.filter((d): d is string => d !== null);
+        const captions = await runVisionCaption(
+            toCaption,
+            'Describe this image in 1-2 sentences. Focus on the main subject and any text visible.',
+            {
+                baseUrl: visionConfig.baseUrl,
+                model: visionConfig.model,
+                provider: visionConfig.provider,
+                maxTokens: 100, // Short descriptions only
+            },
+            concurrency
+        );
+
+        // Captions are index-aligned with the successful downloads
+        let next = 0;
+        return imagesToProcess.map((img, i) => {
+            if (downloaded[i] === null) {
+                return { img, description: img.alt || img.caption || '' };
+            }
+            const description = captions[next++] || '';
+            logger.debug(`Quick description: "${description.substring(0, 100)}..."`);
+            return { img, description };
+        });
     }
 
     /**
      * Score images by semantic relevance using text model to understand content relationship.
+     * All images are rated in one request; any image the batched answer leaves out is scored on its own.
      */
     private async scoreImagesBySemanticRelevance(
         imageDescriptions: Array<{ img: ImageInfo; description: string; }>,
@@ -109,31 +129,66 @@ ${pageText.substring(0, 2000)}${pageText.length > 2000 ? '...' : ''}`;
     ): Promise<Array<{ img: ImageInfo; score: number; reasoning: string; }>> {
         const results: Array<{ img: ImageInfo; score: number; reasoning: string; }> = [];
 
-        const themesList = themes.join(', ');
+        const contexts = imageDescriptions.map(({ img, description }) => [
+            img.alt && `Alt text: ${img.alt}`,
+            img.caption && `Caption: ${img.caption}`,
+            img.heading && `Near heading: ${img.heading}`,
+            img.nearText && `Nearby text: ${img.nearText.substring(0, 200)}`,
+            description && `Visual content: ${description}`
+        ].filter(Boolean).join('\n'));
+
+        // Step 1: one request for the whole batch
+        const batched = new Map<number, { score: number; reasoning: string; }>();
+        if (contexts.length > 1) {
+            const prompt = `Rate the relevance of each image below for a ${role} analysis focused on themes: ${themes.join(', ')}
 
-        for (const { img, description } of imageDescriptions) {
+${contexts.map((c, i) => `Image ${i + 1}:\n${c}`).join('\n\n')}
+
+Rate each image's relevance from 1-10 and explain why. Answer with one line per image, in order. Format: "Image N: Score: X - Reason"`;
             try {
-                const contextInfo = [
-                    img.alt && `Alt text: ${img.alt}`,
-                    img.caption && `Caption: ${img.caption}`,
-                    img.heading && `Near heading: ${img.heading}`,
-                    img.nearText && `Nearby text: ${img.nearText.substring(0, 200)}`,
-                    description && `Visual content: ${description}`
-                ].filter(Boolean).join('\n');
+                const response = await ollamaService.analyzeWithPrompt('', prompt);
+                for (const m of response.matchAll(BATCH_SCORE_RE)) {
+                    const n = parseInt(m[1]);
+                    if (n >= 1 && n <= contexts.length && !batched.has(n - 1)) {
+                        const score = Math.min(10, Math.max(1, parseInt(m[2]))); // prompt asks for 1-10
+                        batched.set(n - 1, { score, reasoning: m[3].trim() });
+                    }
+                }
+                logger.debug(`Batched relevance scoring covered ${batched.size}/${contexts.length} images`);
+            } catch (error) {
+                logger.warn(`Batched image scoring failed, scoring images individually: ${error}`);
+            }
+        }
 
-                const prompt = `Rate the relevance of this image for a ${role} analysis focused on themes: ${themesList}
+        // Everything but the per-image context is identical across images; build it once
+        const promptHead = `Rate the relevance of this image for a ${role} analysis focused on themes: ${themes.join(', ')}
 
 Image information:
-${contextInfo}
+`;
+        const promptTail = `
 
 Rate relevance from 1-10 and explain why. Format: "Score: X - Reason"`;
 
+        // Step 2: individual requests only for images the batch did not cover
+        for (const [i, { img }] of imageDescriptions.entries()) {
+            const hit = batched.get(i);
+            if (hit) {
+                results.push({ img, ...hit });
+                logger.debug(`Image relevance - Score: ${hit.score}, Reasoning: ${hit.reasoning.substring(0, 100)}...`);
+                continue;
+            }
+            try {
+                const prompt = promptHead + contexts[i] + promptTail;
+
                 const response = await ollamaService.analyzeWithPrompt('', prompt);
 
                 // Extract score and reasoning
-                const scoreMatch = response.match(/score:\s*(\d+)/i);
+                // Single scan: the match gives both the score and the span to cut from the reasoning
+                const scoreMatch = SCORE_RE.exec(response);
                 const score = scoreMatch ? parseInt(scoreMatch[1]) : 5;
-                const reasoning = response.replace(/score:\s*\d+\s*-?\s*/i, '').trim();
+                const reasoning = (scoreMatch
+                    ? response.slice(0, scoreMatch.index) + response.slice(scoreMatch.index + scoreMatch[0].length)
+                    : response).trim();
 
                 results.push({
                     img,
@@ -158,6 +213,53 @@ Rate relevance from 1-10 and explain why. Format: "Score: X - Reason"`;
         return results;
     }
 
+    /**
+     * Pick the images worth a detailed vision pass. Ranking costs a text call for themes, a vision
+     * call per candidate and at least one scoring call, so it is skipped when it could not change the selection.
+     */
+    private async selectImages(
+        text: string,
+        images: ImageInfo[],
+        role: Role,
+        vision: any,
+        maxImages: number,
+        dataUris: Map<string, string>
+    ): Promise<{ themes: string[]; selected: Array<{ img: ImageInfo; score?: number; reasoning?: string; }>; }> {
+        if (maxImages === 0) {
+            return { themes: [], selected: [] };
+        }
+        if (maxImages >= images.length) {
+            logger.debug(`All ${images.length} images fit within maxImages; skipping relevance ranking`);
+            return { themes: [], selected: images.map(img => ({ img })) };
+        }
+
+        // Steps 1 and 2 are independent (text model vs. vision model), so run them together
+        // Step 1: Extract key themes from content
+        logger.debug(`Extracting key themes for ${role} analysis...`);
+        // Step 2: Get quick descriptions of all images
+        logger.debug(`Getting quick descriptions for ${images.length} images...`);
+        const [themes, imageDescriptions] = await Promise.all([
+            this.extractKeyThemes(text, role),
+            this.getQuickImageDescriptions(images, vision, dataUris),
+        ]);
+
+        // Step 3: Score images by semantic relevance
+        logger.debug(`Scoring images by semantic relevance to themes: ${themes.join(', ')}`);
+        const semanticScores = await this.scoreImagesBySemanticRelevance(imageDescriptions, themes, role);
+
+        // Step 4: Select top images by relevance score
+        const selected = semanticScores
+            .sort((a, b) => b.score - a.score)
+            .slice(0, maxImages);
+
+        if (logger.isDebugEnabled()) {
+            logger.debug(`Selected ${selected.length} images for detailed vision processing:`,
+                selected.map(s => `${s.img.src.substring(0, 50)}... (score: ${s.score})`));
+        }
+
+        return { themes, selected };
+    }
+
     /**
      * Scrape a URL and then analyze it using the text model and role prompt.
      */
@@ -169,6 +271,7 @@ Rate relevance from 1-10 and explain why. Format: "Score: X - Reason"`;
             system?: string;
             maxTokens?: number;
             maxImages?: number; // limit number of images to caption (default 1)
+            concurrency?: number; // max vision requests in flight (default VISION_CONCURRENCY)
         }
     }): Promise<{ analysis: string; textPath: string | null; imagesPath: string | null; analysisPath: string | null; usedImages: Array<{ src: string; alt?: string; heading?: string; nearText?: string; caption?: string; ocr?: string; relevanceScore?: number; relevanceReason?: string; }>; }> {
         const { url, role = 'marketing', save, output, vision } = args;
@@ -180,7 +283,9 @@ Rate relevance from 1-10 and explain why. Format: "Score: X - Reason"`;
         let usedImages: Array<{ src: string; alt?: string; heading?: string; nearText?: string; caption?: string; ocr?: string; relevanceScore?: number; relevanceReason?: string; }> = [];
 
         // Debug logging for vision configuration
-        logger.debug(`Vision config: ${JSON.stringify(vision)}, Images found: ${images.length}`);
+        if (logger.isDebugEnabled()) {
+            logger.debug(`Vision config: ${JSON.stringify(vision)}, Images found: ${images.length}`);
+        }
 
         if (vision && images.length) {
             logger.debug(`Starting semantic vision processing with config: baseUrl=${vision.baseUrl}, model=${vision.model}, maxImages=${vision.maxImages}`);
@@ -188,47 +293,32 @@ Rate relevance from 1-10 and explain why. Format: "Score: X - Reason"`;
                 const maxImages = Math.max(0, Math.min(Number.isFinite(vision.maxImages as number) ? (vision.maxImages as number) : 1, images.length));
                 logger.debug(`MaxImages calculated: ${maxImages}, Total images available: ${images.length}`);
 
-                // Step 1: Extract key themes from content
-                logger.debug(`Extracting key themes for ${role} analysis...`);
-                const themes = await this.extractKeyThemes(text, role);
-
-                // Step 2: Get quick descriptions of all images
-                logger.debug(`Getting quick descriptions for ${images.length} images...`);
-                const imageDescriptions = await this.getQuickImageDescriptions(images as ImageInfo[], vision);
-
-                // Step 3: Score images by semantic relevance
-                logger.debug(`Scoring images by semantic relevance to themes: ${themes.join(', ')}`);
-                const semanticScores = await this.scoreImagesBySemanticRelevance(imageDescriptions, themes, role);
-
-                // Step 4: Select top images by relevance score
-                const scored = semanticScores
-                    .sort((a, b) => b.score - a.score)
-                    .slice(0, maxImages)
-                    .map(s => s.img);
-
-                logger.debug(`Selected ${scored.length} images for detailed vision processing:`,
-                    semanticScores.slice(0, maxImages).map(s => `${s.img.src.substring(0, 50)}... (score: ${s.score})`));
+                const dataUris = new Map<string, string>();
+                const { themes, selected } = await this.selectImages(text, images as ImageInfo[], role, vision, maxImages, dataUris);
 
-                const localFiles: string[] = [];
-                const mapSrcToFile = new Map<string, string>();
-                for (const m of scored) {
+                // Keep each image's data together with its score so later failures can't shift the pairing
+                const loaded: Array<{ img: ImageInfo; score?: number; reasoning?: string; dataUri: string; }> = [];
+                for (const s of selected) {
                     try {
-                        logger.debug(`Downloading image: ${m.src}`);
-                        const p = await downloadImage(m.src);
-                        localFiles.push(p);
-                        mapSrcToFile.set(m.src, p);
-                        logger.debug(`Successfully downloaded image to: ${p}`);
+                        let dataUri = dataUris.get(s.img.src);
+                        if (!dataUri) {
+                            logger.debug(`Downloading image: ${s.img.src}`);
+                            dataUri = await downloadImageDataUri(s.img.src);
+                        }
+                        loaded.push({ ...s, dataUri });
                     } catch (e) {
-                        logger.warn(`Failed to download image ${m.src}: ${String(e)}`);
+                        logger.warn(`Failed to download image ${s.img.src}: ${String(e)}`);
                     }
                 }
 
-                logger.debug(`Downloaded ${localFiles.length} images successfully, starting vision processing`);
+                // Base64 payloads of images that were not selected are no longer needed
+                dataUris.clear();
+                logger.debug(`Loaded ${loaded.length} images successfully, starting vision processing`);
 
-                if (localFiles.length) {
-                    logger.debug(`Calling vision model ${vision.model} at ${vision.baseUrl} to process ${localFiles.length} images`);
+                if (loaded.length) {
+                    logger.debug(`Calling vision model ${vision.model} at ${vision.baseUrl} to process ${loaded.length} images`);
                     const captions = await runVisionCaption(
-                        localFiles,
+                        loaded.map(l => l.dataUri),
                         'Describe the image in detail and transcribe any visible text. Output Markdown only.',
                         {
                             baseUrl: vision.baseUrl,
@@ -236,32 +326,39 @@ Rate relevance from 1-10 and explain why. Format: "Score: X - Reason"`;
                             provider: vision.provider,
                             system: vision.system,
                             maxTokens: vision.maxTokens,
-                        }
+                        },
+                        vision.concurrency
                     );
-                    logger.debug(`Vision processing completed, received ${captions.length} captions`);
-                    logger.debug(`Caption contents:`, captions.map((c, i) => `[${i}]: "${c.substring(0, 100)}${c.length > 100 ? '...' : ''}"`));
-
-                    // Pair captions back to images with semantic reasoning
-                    const selectedScores = semanticScores.slice(0, captions.length);
-                    usedImages = scored.slice(0, captions.length).map((img, i) => ({
-                        src: img.src,
-                        alt: img.alt,
-                        heading: img.heading,
-                        nearText: img.nearText,
-                        caption: img.caption,
-                        ocr: captions[i],
-                        relevanceScore: selectedScores[i]?.score,
-                        relevanceReason: selectedScores[i]?.reasoning
-                    }));
-
-                    if (captions.length) {
-                        visionAppendix = `\n\n---\n\n### Semantically Selected Image Analysis\n*Selected based on themes: ${themes.join(', ')}*\n\n${usedImages
+
+                    // Captions are index-aligned with `loaded`; keep the images that produced one
+                    const captioned = loaded.flatMap(({ img, score, reasoning }, i) => captions[i]
+                        ? [{
+                            src: img.src,
+                            alt: img.alt,
+                            heading: img.heading,
+                            nearText: img.nearText,
+                            caption: img.caption,
+                            ocr: captions[i],
+                            relevanceScore: score,
+                            relevanceReason: reasoning
+                        }]
+                        : []);
+                    logger.debug(`Vision processing completed, received ${captioned.length} captions`);
+                    if (logger.isDebugEnabled()) {
+                        logger.debug(`Caption contents:`, captioned.map((u, i) => `[${i}]: "${u.ocr.substring(0, 100)}${u.ocr.length > 100 ? '...' : ''}"`));
+                    }
+                    usedImages = captioned;
+
+                    if (usedImages.length) {
+                        visionAppendix = `\n\n---\n\n### Semantically Selected Image Analysis\n${themes.length ? `*Selected based on themes: ${themes.join(', ')}*\n\n` : '\n'}${usedImages
                             .map((u, i) => {
                                 const reasoning = u.relevanceReason ? `\n*Relevance (${u.relevanceScore}/10): ${u.relevanceReason}*\n` : '';
                                 return `**Image ${i + 1}:** ${u.alt ? `(${u.alt})` : ''}${reasoning}\n${u.ocr}`;
                             })
                             .join('\n\n')}\n`;
-                        logger.debug(`Created semantic vision appendix (length: ${visionAppendix.length}):`, visionAppendix.substring(0, 500));
+                        if (logger.isDebugEnabled()) {
+                            logger.debug(`Created semantic vision appendix (length: ${visionAppendix.length}):`, visionAppendix.substring(0, 500));
+                        }
                     } else {
                         logger.warn(`No captions received from vision model - vision appendix will be empty`);
                     }
@@ -14,10 +14,13 @@ export async function writeImagesMarkdown(
     const dt = new Date().toISOString();
     const outPath = join(outDir, 'images.md');
 
+    // Escaped once per image; used by both the preview list and the table
+    const alts = images.map((img) => (img.alt ? escapeMd(img.alt) : ''));
+
     const bulletList = images
-        .map((img) => {
-            const alt = img.alt || 'image';
-            return `- ![${escapeMd(alt)}](${img.src}) — [link](${img.src})`;
+        .map((img, i) => {
+            const alt = alts[i] || 'image';
+            return `- ![${alt}](${img.src}) — [link](${img.src})`;
         })
         .join('\n');
 
@@ -25,7 +28,7 @@ export async function writeImagesMarkdown(
     const tableRows = images
         .map((img, i) => {
             const size = img.width && img.height ? `${img.width}×${img.height}` : '';
-            const alt = img.alt ? escapeMd(img.alt) : '';
+            const alt = alts[i];
             const urlCell = `<${img.src}>`;
             return `| ${i + 1} | ${alt} | ${urlCell} | ${size} |`;
         })
@@ -38,8 +41,10 @@ export async function writeImagesMarkdown(
     return outPath;
 }
 
+const MD_SPECIAL_RE = /[|*_]/g;
+
 function escapeMd(s: string): string {
-    return s.replace(/\|/g, '\\|').replace(/\*/g, '\\*').replace(/_/g, '\\_');
+    return s.replace(MD_SPECIAL_RE, '\\$&');
 }
 
 
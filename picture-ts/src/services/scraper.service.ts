@@ -1,5 +1,6 @@
 import logger from '../lib/logger';
-import { chromium, Page } from 'playwright';
+import type { Browser, BrowserContext, Page } from 'playwright';
+import { BROWSER_IDLE_TIMEOUT } from '../config';
 
 export type ImageInfo = {
     src: string;
@@ -17,6 +18,125 @@ export type ScrapeResult = {
     images: ImageInfo[];
 };
 
+/**
+ * Collect candidate images under `root`. Runs inside the browser via `evaluate`,
+ * so it must stay self-contained (no references to module scope).
+ */
+function collectImages(root: Element): ImageInfo[] {
+    const headingTags = new Set(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']);
+
+    const toAbs = (s: string) => {
+        try {
+            return new URL(s, window.location.href).toString();
+        } catch {
+            return s;
+        }
+    };
+
+    const getText = (node: Element | null | undefined) =>
+        (node?.textContent || '')
+            .replace(/\s+/g, ' ')
+            .trim()
+            .slice(0, 240);
+
+    const findPrevHeading = (start: Element): string => {
+        let node: Element | null = start as Element;
+        let steps = 0;
+        while (node && steps < 25) {
+            const prev = (node as any).previousElementSibling as Element | null;
+            if (prev) {
+                const tag = prev.tagName?.toLowerCase() || '';
+                if (headingTags.has(tag)) {
+                    return getText(prev);
+                }
+                node = prev;
+            } else {
+                node = node.parentElement;
+            }
+            steps++;
+        }
+        return '';
+    };
+
+    const imgs = Array.from(root.querySelectorAll('img')) as HTMLImageElement[];
+    const mapped = imgs.map((img: HTMLImageElement, idx: number) => {
+        const src = (img.getAttribute('src') || '').trim();
+        const alt = (img.getAttribute('alt') || '').trim();
+        const width = Number((img.getAttribute('width') || (img as any).naturalWidth || 0) as any);
+        const height = Number((img.getAttribute('height') || (img as any).naturalHeight || 0) as any);
+        const fig = (img.closest('figure') as HTMLElement | null) || null;
+        const caption = fig ? getText(fig.querySelector('figcaption')) : '';
+        const heading = findPrevHeading(img);
+        const nearText = getText((img.parentElement as Element | null) || fig || img.closest('section') || img.closest('article'));
+        return { src: toAbs(src), alt, width, height, index: idx, caption, heading, nearText } as any;
+    });
+
+    return mapped.filter((m) => {
+        if (!m.src) return false;
+        if (m.src.startsWith('data:')) return false;
+        if (!/^https?:\/\//i.test(m.src)) return false;
+        if ((m.width && m.width < 5) || (m.height && m.height < 5)) return false;
+        return true;
+    });
+}
+
+let browserPromise: Promise<Browser> | null = null;
+let activeScrapes = 0;
+let idleTimer: NodeJS.Timeout | null = null;
+
+/**
+ * Return the shared headless browser, launching it on first use.
+ * Each scrape gets its own context, so cookies and storage are not shared between calls.
+ */
+async function getBrowser(): Promise<Browser> {
+    if (!browserPromise) {
+        // Loaded on demand so commands that never scrape (e.g. --help) skip Playwright's startup cost
+        const launching = import('playwright')
+            .then(({ chromium }) => chromium.launch({ headless: true }))
+            .then((browser) => {
+                // Relaunch on next use if the browser crashes or is closed
+                browser.on('disconnected', () => {
+                    if (browserPromise === launching) browserPromise = null;
+                });
+                return browser;
+            });
+        launching.catch(() => {
+            if (browserPromise === launching) browserPromise = null;
+        });
+        browserPromise = launching;
+    }
+    return browserPromise;
+}
+
+/**
+ * Close the shared browser once no scrape has used it for BROWSER_IDLE_TIMEOUT seconds,
+ * so back-to-back scrapes reuse it but an idle caller is not kept alive by a Chromium child.
+ */
+function scheduleIdleClose(): void {
+    if (idleTimer) clearTimeout(idleTimer);
+    idleTimer = setTimeout(() => {
+        idleTimer = null;
+        if (activeScrapes === 0) void closeBrowser();
+    }, BROWSER_IDLE_TIMEOUT * 1000);
+    idleTimer.unref();
+}
+
+/**
+ * Close the shared browser, if one was launched. It also closes by itself after being idle for
+ * BROWSER_IDLE_TIMEOUT seconds; call this to release it immediately (e.g. on shutdown).
+ */
+export async function closeBrowser(): Promise<void> {
+    if (idleTimer) {
+        clearTimeout(idleTimer);
+        idleTimer = null;
+    }
+    const pending = browserPromise;
+    browserPromise = null;
+    if (pending) {
+        await pending.then((browser) => browser.close()).catch(() => { /* ignore */ });
+    }
+}
+
 /**
  * Scrape the main textual content and discover image links on the page.
  *
@@ -25,10 +145,16 @@ export type ScrapeResult = {
  */
 export async function scrapeContent(url: string): Promise<ScrapeResult> {
     let page: Page | null = null;
-    const browser = await chromium.launch({ headless: true });
+    let context: BrowserContext | null = null;
+    activeScrapes++;
+    if (idleTimer) {
+        clearTimeout(idleTimer);
+        idleTimer = null;
+    }
 
     try {
-        const context = await browser.newContext({
+        const browser = await getBrowser();
+        context = await browser.newContext({
             userAgent:
                 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 ' +
                 '(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
@@ -43,127 +169,17 @@ export async function scrapeContent(url: string): Promise<ScrapeResult> {
         const hasMain = await mainLocator.count();
         const target = hasMain ? mainLocator.first() : page.locator('body');
 
-        // Extract & clean text
-        const rawText = (await target.evaluate((el) => el.textContent ?? '')) || '';
-        const text = rawText.replace(/\s+/g, ' ').trim();
+        // Extract & clean text in the page, so only the collapsed string crosses the protocol
+        // boundary instead of the raw text with all its markup whitespace
+        const text = (await target.evaluate((el) => (el.textContent ?? '').replace(/\s+/g, ' ').trim())) || '';
         logger.info(`Scraped ${text.length} characters from ${url}`);
 
         // Discover images inside main container
-        const inMainImages = await target.evaluate((el) => {
-            const toAbs = (s: string) => {
-                try {
-                    return new URL(s, window.location.href).toString();
-                } catch {
-                    return s;
-                }
-            };
-
-            const getText = (node: Element | null | undefined) =>
-                (node?.textContent || '')
-                    .replace(/\s+/g, ' ')
-                    .trim()
-                    .slice(0, 240);
-
-            const findPrevHeading = (start: Element): string => {
-                let node: Element | null = start as Element;
-                let steps = 0;
-                while (node && steps < 25) {
-                    const prev = (node as any).previousElementSibling as Element | null;
-                    if (prev) {
-                        const tag = prev.tagName?.toLowerCase() || '';
-                        if (['h1', 'h2', 'h3', 'h4', 'h5', 'h6'].includes(tag)) {
-                            return getText(prev);
-                        }
-                        node = prev;
-                    } else {
-                        node = node.parentElement;
-                    }
-                    steps++;
-                }
-                return '';
-            };
-
-            const imgs = Array.from((el as Element).querySelectorAll('img')) as HTMLImageElement[];
-            const mapped = imgs.map((img: HTMLImageElement, idx: number) => {
-                const src = (img.getAttribute('src') || '').trim();
-                const alt = (img.getAttribute('alt') || '').trim();
-                const width = Number((img.getAttribute('width') || (img as any).naturalWidth || 0) as any);
-                const height = Number((img.getAttribute('height') || (img as any).naturalHeight || 0) as any);
-                const fig = (img.closest('figure') as HTMLElement | null) || null;
-                const caption = fig ? getText(fig.querySelector('figcaption')) : '';
-                const heading = findPrevHeading(img);
-                const nearText = getText((img.parentElement as Element | null) || fig || img.closest('section') || img.closest('article'));
-                return { src: toAbs(src), alt, width, height, index: idx, caption, heading, nearText } as any;
-            });
-
-            return mapped.filter((m) => {
-                if (!m.src) return false;
-                if (m.src.startsWith('data:')) return false;
-                if (!/^https?:\/\//i.test(m.src)) return false;
-                if ((m.width && m.width < 5) || (m.height && m.height < 5)) return false;
-                return true;
-            });
-        });
-
-        let images = inMainImages as ImageInfo[];
+        let images = await target.evaluate(collectImages);
 
         // Fallback to scanning entire page for <img>
         if (!images.length) {
-            images = (await page.evaluate(() => {
-                const toAbs = (s: string) => {
-                    try {
-                        return new URL(s, window.location.href).toString();
-                    } catch {
-                        return s;
-                    }
-                };
-
-                const getText = (node: Element | null | undefined) =>
-                    (node?.textContent || '')
-                        .replace(/\s+/g, ' ')
-                        .trim()
-                        .slice(0, 240);
-
-                const findPrevHeading = (start: Element): string => {
-                    let node: Element | null = start as Element;
-                    let steps = 0;
-                    while (node && steps < 25) {
-                        const prev = (node as any).previousElementSibling as Element | null;
-                        if (prev) {
-                            const tag = prev.tagName?.toLowerCase() || '';
-                            if (['h1', 'h2', 'h3', 'h4', 'h5', 'h6'].includes(tag)) {
-                                return getText(prev);
-                            }
-                            node = prev;
-                        } else {
-                            node = node.parentElement;
-                        }
-                        steps++;
-                    }
-                    return '';
-                };
-
-                const imgs = Array.from(document.querySelectorAll('img')) as HTMLImageElement[];
-                const mapped = imgs.map((img: HTMLImageElement, idx: number) => {
-                    const src = (img.getAttribute('src') || '').trim();
-                    const alt = (img.getAttribute('alt') || '').trim();
-                    const width = Number((img.getAttribute('width') || (img as any).naturalWidth || 0) as any);
-                    const height = Number((img.getAttribute('height') || (img as any).naturalHeight || 0) as any);
-                    const fig = (img.closest('figure') as HTMLElement | null) || null;
-                    const caption = fig ? getText(fig.querySelector('figcaption')) : '';
-                    const heading = findPrevHeading(img);
-                    const nearText = getText((img.parentElement as Element | null) || fig || img.closest('section') || img.closest('article'));
-                    return { src: toAbs(src), alt, width, height, index: idx, caption, heading, nearText } as any;
-                });
-
-                return mapped.filter((m) => {
-                    if (!m.src) return false;
-                    if (m.src.startsWith('data:')) return false;
-                    if (!/^https?:\/\//i.test(m.src)) return false;
-                    if ((m.width && m.width < 5) || (m.height && m.height < 5)) return false;
-                    return true;
-                });
-            })) as ImageInfo[];
+            images = await page.locator('body').evaluate(collectImages);
         }
 
         // Dedupe by src
@@ -183,7 +199,8 @@ export async function scrapeContent(url: string): Promise<ScrapeResult> {
         const message = err instanceof Error ? err.message : 'Unknown scraping error';
         throw new Error(`Failed to scrape content from ${url}. ${message}`);
     } finally {
-        await browser.close().catch(() => { /* ignore */ });
+        await context?.close().catch(() => { /* ignore */ });
+        if (--activeScrapes === 0) scheduleIdleClose();
     }
 }
 
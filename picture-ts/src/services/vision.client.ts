@@ -32,7 +32,7 @@ export async function visionChat(
     try {
         if (provider === 'ollama') {
             // Use the same path as text model: /api/generate with prompt+images; no temperature included.
-            const rawB64 = imgDataUri.startsWith('data:') ? imgDataUri.split(',', 2)[1] ?? '' : imgDataUri;
+            const rawB64 = imgDataUri.startsWith('data:') ? imgDataUri.slice(imgDataUri.indexOf(',') + 1) : imgDataUri;
             const res = await fetch(`${baseUrl.replace(/\/$/, '')}/api/generate`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
@@ -65,6 +65,7 @@ export interface OllamaResponse {
     created_at: string;
     response: string;
     done: boolean;
+    error?: string; // set on a failure frame, which can arrive mid-stream
     context?: number[];
     total_duration?: number;
     load_duration?: number;